@@ -1,7 +1,129 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import plotly.express as px
+import plotly.graph_objects as go
+import numpy as np
+
+# Upper bound on points sent to the browser for the balance chart
+MAX_CHART_POINTS = 2000
+
+# Categories used across the ledger versions; a fixed set keeps the dtype stable across concat
+CATEGORIES = ['Income', 'Expense', 'Investment', 'Other', 'Transfer', 'Expenses']
+
+COLUMN_TYPES = {
+    'Date': 'datetime64[ns]',
+    'Description': 'string[pyarrow]',
+    'Category': pd.CategoricalDtype(CATEGORIES),
+    'Debit': 'int64',
+    'Credit': 'int64',
+    'Balance': 'int64'
+}
+
+# Monetary columns are held as integer cents and only shown as dollars
+MONEY_COLUMNS = ['Debit', 'Credit', 'Balance']
+
+# Preformatted dollar strings shown in the transaction table
+DISPLAY_COLUMNS = {col: f'_{col}_s' for col in MONEY_COLUMNS}
+
+# Cents to '$1,234.56' strings, formatted once per row instead of on every render
+def format_currency(cents):
+    return '$' + (cents / 100).map('{:,.2f}'.format).astype('string[pyarrow]')
+
+# Derived columns kept next to the ledger: preformatted amounts
+def add_derived_columns(df):
+    for col, display_col in DISPLAY_COLUMNS.items():
+        df[display_col] = format_currency(df[col])
+    return df
+
+# Display an amount held in cents as dollars
+def format_cents(cents):
+    return f"${cents / 100:,.2f}"
+
+# Flush buffered rows into the transactions DataFrame
+def materialize_transactions():
+    rows = st.session_state.tx_rows
+    if rows:
+        # Build each column straight into the ledger's dtype so concat never has to upcast
+        new_rows = pd.DataFrame({
+            col: pd.array([row[col] for row in rows], dtype=dtype)
+            for col, dtype in COLUMN_TYPES.items()
+        })
+        new_rows = add_derived_columns(new_rows)
+        st.session_state.transactions = pd.concat(
+            [st.session_state.transactions, new_rows],
+            ignore_index=True
+        )
+        rows.clear()
+    return st.session_state.transactions
+
+# Largest-Triangle-Three-Buckets: indices of at most n_out points that keep the line's shape
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x = x[edges[i + 1]:edges[i + 2]].mean()
+        next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+# Per-month totals as a small DataFrame, built from the session's running monthly cache
+def monthly_summary_from_cache():
+    monthly_summary = pd.DataFrame.from_dict(
+        st.session_state.monthly_cache, orient='index', columns=['Debit', 'Credit']
+    )
+    return monthly_summary.rename_axis('Month').reset_index().sort_values('Month')
+
+# Balance chart kept per session: reused as-is while the ledger is unchanged,
+# otherwise only its trace data is replaced
+def balance_figure(transactions):
+    # The v1 ledger only grows, so its length identifies its contents
+    fingerprint = len(transactions)
+    cached = st.session_state.get('balance_fig')
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    if cached is None:
+        fig = go.Figure(go.Scattergl(mode='lines', name='Balance'))
+        fig.update_layout(
+            title='Balance Over Time',
+            xaxis_title='Date',
+            yaxis_title='Balance'
+        )
+    else:
+        fig = cached[1]
+    dates = transactions['Date'].to_numpy()
+    balances = transactions['Balance'].to_numpy()
+    idx = lttb_indices(dates.astype('int64'), balances, MAX_CHART_POINTS)
+    fig.data[0].update(x=dates[idx], y=balances[idx] / 100)
+    st.session_state.balance_fig = (fingerprint, fig)
+    return fig
+
+# Monthly debit/credit bars, cached on the small per-month arrays rather than the ledger
+@st.cache_data(max_entries=4, show_spinner=False)
+def monthly_figure(months, debit, credit):
+    fig = go.Figure([
+        go.Bar(name='Debit', x=list(months), y=debit / 100),
+        go.Bar(name='Credit', x=list(months), y=credit / 100)
+    ])
+    fig.update_layout(barmode='group', title='Monthly Debit vs Credit', xaxis_title='Month', yaxis_title='Amount')
+    return fig
+
+# Debit share per category, cached on the per-category totals
+@st.cache_data(max_entries=4, show_spinner=False)
+def category_figure(categories, debit):
+    fig = go.Figure(go.Pie(labels=list(categories), values=debit / 100))
+    fig.update_layout(title='Expenses by Category')
+    return fig
 
 def main():
     st.set_page_config(page_title="Financial Ledger", layout="wide")
@@ -12,9 +134,20 @@ def main():
     
     # Initialize session state for storing transactions
     if 'transactions' not in st.session_state:
-        st.session_state.transactions = pd.DataFrame(
-            columns=['Date', 'Description', 'Category', 'Debit', 'Credit', 'Balance']
+        st.session_state.transactions = add_derived_columns(
+            pd.DataFrame(columns=list(COLUMN_TYPES)).astype(COLUMN_TYPES)
         )
+    # Rows added since the last render, kept as plain dicts until needed
+    if 'tx_rows' not in st.session_state:
+        st.session_state.tx_rows = []
+    if 'last_balance' not in st.session_state:
+        st.session_state.last_balance = 0
+    # Running debit/credit totals per 'YYYY-MM', updated as transactions are added
+    if 'monthly_cache' not in st.session_state:
+        st.session_state.monthly_cache = {}
+    # Ledger-wide debit/credit totals, bumped alongside the monthly ones
+    if 'totals' not in st.session_state:
+        st.session_state.totals = {'Debit': 0, 'Credit': 0}
 
     if page == "Dashboard":
         show_dashboard()
@@ -25,6 +158,7 @@ def main():
 
 def show_dashboard():
     st.title("Financial Dashboard")
+    transactions = materialize_transactions()
     
     # Summary metrics
     col1, col2, col3 = st.columns(3)
@@ -32,32 +166,24 @@ def show_dashboard():
     with col1:
         st.metric(
             label="Total Balance",
-            value=f"${st.session_state.transactions['Balance'].iloc[-1] if len(st.session_state.transactions) > 0 else 0:,.2f}"
+            value=format_cents(st.session_state.last_balance)
         )
     
     with col2:
-        total_debits = st.session_state.transactions['Debit'].sum()
-        st.metric(label="Total Debits", value=f"${total_debits:,.2f}")
+        st.metric(label="Total Debits", value=format_cents(st.session_state.totals['Debit']))
     
     with col3:
-        total_credits = st.session_state.transactions['Credit'].sum()
-        st.metric(label="Total Credits", value=f"${total_credits:,.2f}")
+        st.metric(label="Total Credits", value=format_cents(st.session_state.totals['Credit']))
     
     # Transaction trends
-    if len(st.session_state.transactions) > 0:
+    if len(transactions) > 0:
         st.subheader("Balance Trend")
-        fig = px.line(
-            st.session_state.transactions,
-            x='Date',
-            y='Balance',
-            title='Balance Over Time'
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        fig = balance_figure(transactions)
+        st.plotly_chart(fig, use_container_width=True, key='balance_chart')
 
-def show_transactions():
-    st.title("Transaction Management")
-    
-    # Transaction input form
+# Transaction input form; a fragment so submitting reruns only the form
+@st.fragment
+def add_transaction_form():
     with st.form("transaction_form"):
         col1, col2, col3 = st.columns(3)
         
@@ -78,73 +204,70 @@ def show_transactions():
         submitted = st.form_submit_button("Add Transaction")
         
         if submitted:
-            debit = amount if transaction_type == "Debit" else 0
-            credit = amount if transaction_type == "Credit" else 0
+            amount_cents = int(round(amount * 100))
+            debit = amount_cents if transaction_type == "Debit" else 0
+            credit = amount_cents if transaction_type == "Credit" else 0
             
             # Calculate new balance
-            current_balance = (
-                st.session_state.transactions['Balance'].iloc[-1]
-                if len(st.session_state.transactions) > 0
-                else 0
+            new_balance = st.session_state.last_balance + credit - debit
+            st.session_state.last_balance = new_balance
+            month = st.session_state.monthly_cache.setdefault(
+                date.strftime('%Y-%m'), {'Debit': 0, 'Credit': 0}
             )
-            new_balance = current_balance + credit - debit
+            month['Debit'] += debit
+            month['Credit'] += credit
+            st.session_state.totals['Debit'] += debit
+            st.session_state.totals['Credit'] += credit
             
-            # Add new transaction
-            new_transaction = pd.DataFrame({
-                'Date': [date],
-                'Description': [description],
-                'Category': [category],
-                'Debit': [debit],
-                'Credit': [credit],
-                'Balance': [new_balance]
+            # Buffer new transaction
+            st.session_state.tx_rows.append({
+                'Date': date,
+                'Description': description,
+                'Category': category,
+                'Debit': debit,
+                'Credit': credit,
+                'Balance': new_balance
             })
-            
-            st.session_state.transactions = pd.concat(
-                [st.session_state.transactions, new_transaction],
-                ignore_index=True
-            )
             st.success("Transaction added successfully!")
 
+def show_transactions():
+    st.title("Transaction Management")
+    
+    add_transaction_form()
+
     # Display transactions table
     st.subheader("Transaction History")
     st.dataframe(
-        st.session_state.transactions.style.format({
-            'Debit': '${:,.2f}',
-            'Credit': '${:,.2f}',
-            'Balance': '${:,.2f}'
-        }),
+        materialize_transactions()[['Date', 'Description', 'Category', *DISPLAY_COLUMNS.values()]],
+        column_config={
+            'Date': st.column_config.DateColumn('Date', format='YYYY-MM-DD'),
+            **{display_col: st.column_config.TextColumn(col) for col, display_col in DISPLAY_COLUMNS.items()}
+        },
         use_container_width=True
     )
 
 def show_reports():
     st.title("Financial Reports")
+    transactions = materialize_transactions()
     
-    if len(st.session_state.transactions) > 0:
+    if len(transactions) > 0:
         # Category breakdown
         st.subheader("Category Analysis")
-        fig_category = px.pie(
-            st.session_state.transactions,
-            values='Debit',
-            names='Category',
-            title='Expenses by Category'
+        category_summary = transactions.groupby('Category', observed=True)['Debit'].sum()
+        fig_category = category_figure(
+            tuple(category_summary.index.astype(str)),
+            category_summary.to_numpy(dtype=np.int64)
         )
         st.plotly_chart(fig_category, use_container_width=True)
         
         # Monthly trends
         st.subheader("Monthly Trends")
-        monthly_data = st.session_state.transactions.copy()
-        monthly_data['Month'] = pd.to_datetime(monthly_data['Date']).dt.strftime('%Y-%m')
-        monthly_summary = monthly_data.groupby('Month').agg({
-            'Debit': 'sum',
-            'Credit': 'sum'
-        }).reset_index()
+        monthly_summary = monthly_summary_from_cache()
         
-        fig_monthly = px.bar(
-            monthly_summary,
-            x='Month',
-            y=['Debit', 'Credit'],
-            title='Monthly Debit vs Credit',
-            barmode='group'
+        fig_monthly = monthly_figure(
+            tuple(monthly_summary['Month'].astype(str)),
+            monthly_summary['Debit'].to_numpy(dtype=np.int64),
+            monthly_summary['Credit'].to_numpy(dtype=np.int64)
         )
         st.plotly_chart(fig_monthly, use_container_width=True)
     else:
@@ -1,46 +1,382 @@
 import streamlit as st
 import pandas as pd
 from datetime import datetime
-import plotly.express as px
+import plotly.graph_objects as go
+import numpy as np
+import duckdb
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ThreadPoolExecutor
+import glob
+import threading
 import os
+import time
+import uuid
 
-DATA_FILE = "transactions.csv"
+CSV_FILE = "transactions.csv"
+PARQUET_FILE = "transactions.parquet"
+
+# Added rows are written here as small Parquet files and folded into PARQUET_FILE on the next full rewrite
+APPEND_DIR = "transactions_appends"
+MAX_APPEND_FILES = 50
+
+# Store the ledger as Parquet; set to False to keep using CSV
+FAST_IO = True
+
+# Upper bound on points sent to the browser for the balance chart
+MAX_CHART_POINTS = 2000
+
+# Categories used across the ledger versions; a loaded ledger extends them with any others it holds
+CATEGORIES = ['Income', 'Expense', 'Investment', 'Other', 'Transfer', 'Expenses']
 
 COLUMN_TYPES = {
     'Date': 'datetime64[ns]',
-    'Description': 'string',
-    'Category': 'string',
+    'Description': 'string[pyarrow]',
+    'Category': pd.CategoricalDtype(CATEGORIES),
+    'Debit': 'int64',
+    'Credit': 'int64',
+    'Balance': 'int64'
+}
+
+# Monetary columns are held as integer cents and only shown as dollars
+MONEY_COLUMNS = ['Debit', 'Credit', 'Balance']
+
+# Types for a single-pass CSV parse; amounts become cents and Category a categorical once its values are known
+CSV_DTYPES = {
+    'Description': COLUMN_TYPES['Description'],
+    'Category': 'string[pyarrow]',
     'Debit': 'float64',
     'Credit': 'float64',
     'Balance': 'float64'
 }
 
-# Load transactions
-@st.cache_data
-def load_transactions():
-    if os.path.exists(DATA_FILE):
-        df = pd.read_csv(DATA_FILE)
-        df = df.astype(COLUMN_TYPES, errors='ignore')
-        df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
-        return df
-    return pd.DataFrame(columns=COLUMN_TYPES.keys())
-
-# Save transactions
-def save_transactions(transactions):
-    transactions.to_csv(DATA_FILE, index=False)
-
-# Recalculate balance
-def recalculate_balance(df):
-    df['Balance'] = df['Credit'].cumsum() - df['Debit'].cumsum()
+# Preformatted dollar strings shown in the transaction table
+DISPLAY_COLUMNS = {col: f'_{col}_s' for col in MONEY_COLUMNS}
+
+# Dollar amounts to int64 cents, rounded once
+def dollars_to_cents(amounts):
+    return (amounts.fillna(0) * 100).round().astype('int64')
+
+# The known categories plus any others a ledger already holds, so loading never turns a category into NaN
+def category_dtype(categories):
+    extra = sorted(set(categories.dropna().astype(str)) - set(CATEGORIES))
+    return pd.CategoricalDtype(CATEGORIES + extra)
+
+# Cents to '$1,234.56' strings, formatted once per row instead of on every render
+def format_currency(cents):
+    return '$' + (cents / 100).map('{:,.2f}'.format).astype('string[pyarrow]')
+
+# Derived columns kept next to the ledger: report month and preformatted amounts
+def add_derived_columns(df):
+    df['Month'] = df['Date'].dt.to_period('M')
+    for col, display_col in DISPLAY_COLUMNS.items():
+        df[display_col] = format_currency(df[col])
     return df
 
+# Display an amount held in cents as dollars
+def format_cents(cents):
+    return f"${cents / 100:,.2f}"
+
+# Base Parquet file followed by any appended row files, in write order
+def ledger_files():
+    return [PARQUET_FILE] + sorted(glob.glob(os.path.join(APPEND_DIR, '*.parquet')))
+
+# One lock per process around listing-and-reading the ledger files and around every write,
+# so a reader never sees the new base file next to append files a rewrite is about to delete
+@st.cache_resource
+def ledger_lock():
+    return threading.Lock()
+
+# Money columns a Parquet file still holds as float dollars, as written before the switch to cents
+def float_money_columns(path):
+    schema = pq.read_schema(path)
+    return [col for col in MONEY_COLUMNS if pa.types.is_floating(schema.field(col).type)]
+
+# Newest modification time across the ledger files, so edits made outside the app reload
+def ledger_mtime():
+    with ledger_lock():
+        paths = ledger_files() if FAST_IO and os.path.exists(PARQUET_FILE) else [CSV_FILE]
+        return max((os.path.getmtime(path) for path in paths if os.path.exists(path)), default=0.0)
+
+# Load transactions; `mtime` only keys the cache
+@st.cache_data(ttl=None, show_spinner=False)
+def load_transactions(mtime):
+    legacy_columns = []
+    if FAST_IO and os.path.exists(PARQUET_FILE):
+        with ledger_lock():
+            files = ledger_files()
+            legacy_columns = float_money_columns(PARQUET_FILE)
+            # Append files always hold cents, so a float base file is read and converted on its own
+            df = pd.read_parquet(files[:1] if legacy_columns else files, engine='pyarrow')
+            if legacy_columns:
+                for col in legacy_columns:
+                    df[col] = dollars_to_cents(df[col])
+                df = pd.concat([df] + [pd.read_parquet(path, engine='pyarrow') for path in files[1:]],
+                               ignore_index=True)
+    elif os.path.exists(CSV_FILE):
+        df = pd.read_csv(CSV_FILE, engine='pyarrow', dtype=CSV_DTYPES, parse_dates=['Date'])
+        # A date that fails to parse leaves the column as text; coerce those to NaT
+        if not pd.api.types.is_datetime64_any_dtype(df['Date']):
+            df['Date'] = pd.to_datetime(df['Date'], errors='coerce')
+        df['Date'] = df['Date'].astype(COLUMN_TYPES['Date'])
+        for col in MONEY_COLUMNS:
+            df[col] = dollars_to_cents(df[col])
+    else:
+        df = pd.DataFrame(columns=COLUMN_TYPES.keys()).astype(COLUMN_TYPES)
+    df['Category'] = df['Category'].astype(category_dtype(df['Category']))
+    if FAST_IO and os.path.exists(CSV_FILE) and not os.path.exists(PARQUET_FILE):
+        # One-time migration of an existing CSV ledger
+        save_transactions(df)
+    elif FAST_IO and legacy_columns:
+        # Rewrite a float-dollar Parquet ledger as cents, so DuckDB reports and appends only see int64
+        save_transactions(df)
+    return add_derived_columns(df)
+
+# Whether a Parquet file holds every money column as int64 cents, the layout append files are written in
+def has_cent_columns(path):
+    schema = pq.read_schema(path)
+    return all(schema.field(col).type == pa.int64() for col in MONEY_COLUMNS)
+
+# Appending is only valid on top of a base file this session has saved in the append layout, until compaction is due
+def can_append(saved_rows, total_rows):
+    return (FAST_IO and os.path.exists(PARQUET_FILE) and 0 < saved_rows <= total_rows
+            and len(ledger_files()) <= MAX_APPEND_FILES and has_cent_columns(PARQUET_FILE))
+
+# One background writer per process: saves no longer block the rerun, and a single worker keeps them in order
+@st.cache_resource
+def get_writer():
+    return ThreadPoolExecutor(max_workers=1, thread_name_prefix='ledger-writer')
+
+# Run a ledger write on the writer thread while holding the file lock
+def locked_write(lock, fn, *args):
+    with lock:
+        fn(*args)
+
+# Queue a write and keep its future until it is known to have succeeded
+def submit_write(fn, *args):
+    future = get_writer().submit(locked_write, ledger_lock(), fn, *args)
+    st.session_state.pending_writes = st.session_state.get('pending_writes', []) + [future]
+
+# Forget finished writes. After a failed one the files can't be trusted, so the next
+# save rewrites the whole ledger instead of appending after the gap; main reports the error.
+def check_writes():
+    pending_writes = st.session_state.get('pending_writes', [])
+    for future in pending_writes:
+        if future.done() and future.exception() is not None:
+            st.session_state.saved_rows = 0
+            st.session_state.write_error = future.exception()
+    st.session_state.pending_writes = [future for future in pending_writes if not future.done()]
+
+# Block until this session's queued saves have landed, so queries over the files see them
+def wait_for_write():
+    for future in st.session_state.get('pending_writes', []):
+        # Waits without raising; check_writes deals with failures
+        future.exception()
+
+# Write through a temp file and rename, so readers never see a half-written ledger
+def write_atomic(path, write):
+    tmp = path + '.tmp'
+    write(tmp)
+    os.replace(tmp, path)
+
+# Write rows to a new append file next to the base Parquet ledger
+def append_parquet(rows):
+    os.makedirs(APPEND_DIR, exist_ok=True)
+    path = os.path.join(APPEND_DIR, f"{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.parquet")
+    write_atomic(path, lambda tmp: rows.to_parquet(tmp, engine='pyarrow', compression='zstd', index=False))
+
+# Full rewrite: deletes invalidate earlier files, and this compacts the appends.
+# Append files are listed at write time so ones queued before this write are folded in too.
+def rewrite_parquet(transactions):
+    write_atomic(PARQUET_FILE, lambda tmp: transactions.to_parquet(tmp, engine='pyarrow', compression='zstd', index=False))
+    for path in ledger_files()[1:]:
+        os.remove(path)
+
+def write_csv(transactions):
+    dollars = transactions.assign(**{col: transactions[col] / 100 for col in MONEY_COLUMNS})
+    write_atomic(CSV_FILE, lambda tmp: dollars.to_csv(tmp, index=False))
+
+# Save transactions; with append=True only rows added since the last save are written
+def save_transactions(transactions, append=False):
+    transactions = transactions[list(COLUMN_TYPES)].copy()
+    check_writes()
+    saved_rows = st.session_state.get('saved_rows', 0)
+    if not FAST_IO:
+        submit_write(write_csv, transactions)
+    elif append and can_append(saved_rows, len(transactions)):
+        submit_write(append_parquet, transactions.iloc[saved_rows:])
+    else:
+        submit_write(rewrite_parquet, transactions)
+    st.session_state.saved_rows = len(transactions)
+    load_transactions.clear()
+
+# Cache key for derived aggregations: row count, latest date and closing balance
+def ledger_fingerprint(df):
+    if df.empty:
+        return (0, None, 0)
+    return (len(df), df['Date'].max(), int(df['Balance'].iloc[-1]))
+
+# Shared DuckDB connection for report queries over the Parquet ledger
+@st.cache_resource
+def get_duckdb():
+    return duckdb.connect(':memory:')
+
+# Monthly debit/credit totals, recomputed only when the ledger or its files change
+@st.cache_data(show_spinner=False)
+def summarize_monthly(_transactions, fingerprint, mtime):
+    if FAST_IO and os.path.exists(PARQUET_FILE):
+        # Group on the truncated date and format only the per-month results
+        with ledger_lock():
+            return get_duckdb().cursor().execute(
+                "SELECT strftime(Month, '%Y-%m') AS Month, Debit, Credit FROM ("
+                "SELECT date_trunc('month', Date) AS Month, SUM(Debit)::BIGINT AS Debit, SUM(Credit)::BIGINT AS Credit "
+                "FROM read_parquet(?) WHERE Date IS NOT NULL GROUP BY 1) ORDER BY 1",
+                [ledger_files()]
+            ).df()
+    monthly_summary = _transactions.groupby('Month')[['Debit', 'Credit']].sum().reset_index()
+    return monthly_summary.astype({'Month': str})
+
+# Debit totals per category, recomputed only when the ledger or its files change
+@st.cache_data(show_spinner=False)
+def summarize_categories(_transactions, fingerprint, mtime):
+    if FAST_IO and os.path.exists(PARQUET_FILE):
+        with ledger_lock():
+            return get_duckdb().cursor().execute(
+                "SELECT Category, SUM(Debit)::BIGINT AS Debit "
+                "FROM read_parquet(?) GROUP BY Category ORDER BY Category",
+                [ledger_files()]
+            ).df()
+    return _transactions.groupby('Category', observed=True)['Debit'].sum().reset_index()
+
+# Running debit/credit totals per 'YYYY-MM', rebuilt on load and kept in step on add
+def build_monthly_cache(df):
+    wait_for_write()
+    monthly_summary = summarize_monthly(df, ledger_fingerprint(df), ledger_mtime())
+    return monthly_summary.set_index('Month')[['Debit', 'Credit']].to_dict('index')
+
+# Ledger-wide debit/credit totals, kept in session and bumped on add
+def ledger_totals(df):
+    return {col: int(df[col].to_numpy().sum()) for col in ('Debit', 'Credit')}
+
+# Per-month totals as a small DataFrame, built from the session's running monthly cache
+def monthly_summary_from_cache():
+    monthly_summary = pd.DataFrame.from_dict(
+        st.session_state.monthly_cache, orient='index', columns=['Debit', 'Credit']
+    )
+    return monthly_summary.rename_axis('Month').reset_index().sort_values('Month')
+
+# Buffered rows as a frame, each column built straight into the ledger's dtype so concat never upcasts
+def rows_to_frame(rows):
+    dtypes = {**COLUMN_TYPES, 'Category': st.session_state.transactions['Category'].dtype}
+    return pd.DataFrame({
+        col: pd.array([row[col] for row in rows], dtype=dtype)
+        for col, dtype in dtypes.items()
+    })
+
+# Flush buffered rows into the transactions DataFrame
+def materialize_transactions():
+    rows = st.session_state.tx_rows
+    if rows:
+        new_rows = rows_to_frame(rows)
+        new_rows = add_derived_columns(new_rows)
+        st.session_state.transactions = pd.concat([st.session_state.transactions, new_rows], ignore_index=True)
+        rows.clear()
+    return st.session_state.transactions
+
+# Persist the buffered rows not yet on disk without concatenating them onto the ledger
+def save_buffered_rows():
+    transactions, rows = st.session_state.transactions, st.session_state.tx_rows
+    check_writes()
+    saved_rows = st.session_state.get('saved_rows', 0)
+    total_rows = len(transactions) + len(rows)
+    if saved_rows < len(transactions) or not can_append(saved_rows, total_rows):
+        save_transactions(materialize_transactions(), append=True)
+        return
+    submit_write(append_parquet, rows_to_frame(rows[saved_rows - len(transactions):]))
+    st.session_state.saved_rows = total_rows
+    load_transactions.clear()
+
+# Largest-Triangle-Three-Buckets: indices of at most n_out points that keep the line's shape
+def lttb_indices(x, y, n_out):
+    n = len(x)
+    if n <= n_out or n_out < 3:
+        return np.arange(n)
+    x = x.astype(np.float64)
+    y = y.astype(np.float64)
+    # First and last points are always kept; the rest are split into n_out - 2 buckets
+    edges = np.append(np.linspace(1, n - 1, n_out - 1).astype(np.int64), n)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        next_x = x[edges[i + 1]:edges[i + 2]].mean()
+        next_y = y[edges[i + 1]:edges[i + 2]].mean()
+        area = np.abs((x[a] - next_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (next_y - y[a]))
+        a = lo + int(area.argmax())
+        out[i + 1] = a
+    return out
+
+# Balance chart kept per session: reused as-is while the ledger is unchanged,
+# otherwise only its trace data is replaced
+def balance_figure(transactions):
+    fingerprint = ledger_fingerprint(transactions)
+    cached = st.session_state.get('balance_fig')
+    if cached is not None and cached[0] == fingerprint:
+        return cached[1]
+    if cached is None:
+        fig = go.Figure(go.Scattergl(mode='lines', name='Balance'))
+        fig.update_layout(title='Balance Over Time', xaxis_title='Date', yaxis_title='Balance')
+    else:
+        fig = cached[1]
+    dates = transactions['Date'].to_numpy()
+    balances = transactions['Balance'].to_numpy()
+    idx = lttb_indices(dates.astype('int64'), balances, MAX_CHART_POINTS)
+    fig.data[0].update(x=dates[idx], y=balances[idx] / 100)
+    st.session_state.balance_fig = (fingerprint, fig)
+    return fig
+
+# Monthly debit/credit bars, cached on the small per-month arrays rather than the ledger
+@st.cache_data(max_entries=4, show_spinner=False)
+def monthly_figure(months, debit, credit):
+    fig = go.Figure([
+        go.Bar(name='Debit', x=list(months), y=debit / 100),
+        go.Bar(name='Credit', x=list(months), y=credit / 100)
+    ])
+    fig.update_layout(barmode='group', title='Monthly Debit vs Credit', xaxis_title='Month', yaxis_title='Amount')
+    return fig
+
+# Debit share per category, cached on the per-category totals
+@st.cache_data(max_entries=4, show_spinner=False)
+def category_figure(categories, debit):
+    fig = go.Figure(go.Pie(labels=list(categories), values=debit / 100))
+    fig.update_layout(title='Expenses by Category')
+    return fig
+
 def main():
     st.set_page_config(page_title="Financial Ledger", layout="wide")
     st.sidebar.title("Navigation")
     page = st.sidebar.radio("Go to", ["Dashboard", "Transactions", "Reports"])
 
     if 'transactions' not in st.session_state:
-        st.session_state.transactions = load_transactions()
+        st.session_state.transactions = load_transactions(ledger_mtime())
+    transactions = st.session_state.transactions
+    if 'tx_rows' not in st.session_state:
+        st.session_state.tx_rows = []
+    if 'saved_rows' not in st.session_state:
+        st.session_state.saved_rows = len(transactions)
+    if 'last_balance' not in st.session_state:
+        st.session_state.last_balance = int(transactions['Balance'].iloc[-1]) if len(transactions) > 0 else 0
+    if 'monthly_cache' not in st.session_state:
+        st.session_state.monthly_cache = build_monthly_cache(transactions)
+    if 'totals' not in st.session_state:
+        st.session_state.totals = ledger_totals(transactions)
+
+    check_writes()
+    write_error = st.session_state.pop('write_error', None)
+    if write_error is not None:
+        st.error(f"Saving transactions failed: {write_error}. Retrying with a full save.")
+        save_transactions(materialize_transactions())
 
     if page == "Dashboard":
         show_dashboard()
@@ -51,83 +387,101 @@ def main():
 
 def show_dashboard():
     st.title("Dashboard")
-    transactions = st.session_state.transactions
+    transactions = materialize_transactions()
     if transactions.empty:
         st.info("No transactions available.")
         return
 
     col1, col2, col3 = st.columns(3)
     with col1:
-        st.metric("Total Balance", f"${transactions['Balance'].iloc[-1]:,.2f}")
+        st.metric("Total Balance", format_cents(st.session_state.last_balance))
     with col2:
-        st.metric("Total Debits", f"${transactions['Debit'].sum():,.2f}")
+        st.metric("Total Debits", format_cents(st.session_state.totals['Debit']))
     with col3:
-        st.metric("Total Credits", f"${transactions['Credit'].sum():,.2f}")
+        st.metric("Total Credits", format_cents(st.session_state.totals['Credit']))
 
     st.subheader("Balance Over Time")
-    fig = px.line(transactions, x='Date', y='Balance', title='Balance Over Time')
-    st.plotly_chart(fig, use_container_width=True)
+    fig = balance_figure(transactions)
+    st.plotly_chart(fig, use_container_width=True, key='balance_chart')
+
+# Add-transaction form; a fragment so submitting reruns only the form
+@st.fragment
+def add_transaction_form():
+    with st.form("add_transaction_form"):
+        date = st.date_input("Date", datetime.today())
+        description = st.text_input("Description")
+        category = st.selectbox("Category", ["Income", "Expense", "Investment", "Other"])
+        transaction_type = st.selectbox("Type", ["Debit", "Credit"])
+        amount = st.number_input("Amount", min_value=0.0, format="%.2f")
+        submitted = st.form_submit_button("Add Transaction")
+
+        if submitted:
+            amount_cents = int(round(amount * 100))
+            debit, credit = (amount_cents, 0) if transaction_type == "Debit" else (0, amount_cents)
+            new_balance = st.session_state.last_balance + credit - debit
+            st.session_state.last_balance = new_balance
+            month = st.session_state.monthly_cache.setdefault(date.strftime('%Y-%m'), {'Debit': 0, 'Credit': 0})
+            month['Debit'] += debit
+            month['Credit'] += credit
+            st.session_state.totals['Debit'] += debit
+            st.session_state.totals['Credit'] += credit
+            st.session_state.tx_rows.append({
+                'Date': date,
+                'Description': description,
+                'Category': category,
+                'Debit': debit,
+                'Credit': credit,
+                'Balance': new_balance
+            })
+            save_buffered_rows()
+            st.success("Transaction added successfully!")
 
 def show_transactions():
     st.title("Manage Transactions")
     tab1, tab2 = st.tabs(["Add Transactions", "View Transactions"])
 
     with tab1:
-        with st.form("add_transaction_form"):
-            date = st.date_input("Date", datetime.today())
-            description = st.text_input("Description")
-            category = st.selectbox("Category", ["Income", "Expense", "Investment", "Other"])
-            transaction_type = st.selectbox("Type", ["Debit", "Credit"])
-            amount = st.number_input("Amount", min_value=0.0, format="%.2f")
-            submitted = st.form_submit_button("Add Transaction")
-
-            if submitted:
-                debit, credit = (amount, 0) if transaction_type == "Debit" else (0, amount)
-                new_transaction = pd.DataFrame({
-                    'Date': [date],
-                    'Description': [description],
-                    'Category': [category],
-                    'Debit': [debit],
-                    'Credit': [credit],
-                    'Balance': [0]
-                })
-                st.session_state.transactions = pd.concat([st.session_state.transactions, new_transaction], ignore_index=True)
-                st.session_state.transactions = recalculate_balance(st.session_state.transactions)
-                save_transactions(st.session_state.transactions)
-                st.success("Transaction added successfully!")
+        add_transaction_form()
 
     with tab2:
-        transactions = st.session_state.transactions
+        transactions = materialize_transactions()
         if not transactions.empty:
-            st.dataframe(transactions.style.format({
-                'Date': lambda x: x.strftime('%Y-%m-%d') if pd.notnull(x) else '',
-                'Debit': '${:,.2f}',
-                'Credit': '${:,.2f}',
-                'Balance': '${:,.2f}'
-            }), use_container_width=True)
+            st.dataframe(
+                transactions[['Date', 'Description', 'Category', *DISPLAY_COLUMNS.values()]],
+                column_config={
+                    'Date': st.column_config.DateColumn('Date', format='YYYY-MM-DD'),
+                    **{display_col: st.column_config.TextColumn(col) for col, display_col in DISPLAY_COLUMNS.items()}
+                },
+                use_container_width=True
+            )
         else:
             st.info("No transactions available.")
 
 def show_reports():
     st.title("Reports")
-    transactions = st.session_state.transactions
+    transactions = materialize_transactions()
     if transactions.empty:
         st.warning("No transactions available for reports.")
         return
 
-    transactions['Month'] = transactions['Date'].dt.to_period('M').astype(str)
-    monthly_summary = transactions.groupby('Month').agg({
-        'Debit': 'sum',
-        'Credit': 'sum'
-    }).reset_index()
+    fingerprint = ledger_fingerprint(transactions)
+    monthly_summary = monthly_summary_from_cache()
 
     st.subheader("Monthly Trends")
-    fig = px.bar(monthly_summary, x='Month', y=['Debit', 'Credit'], barmode='group', title='Monthly Debit vs Credit')
+    fig = monthly_figure(
+        tuple(monthly_summary['Month'].astype(str)),
+        monthly_summary['Debit'].to_numpy(dtype=np.int64),
+        monthly_summary['Credit'].to_numpy(dtype=np.int64)
+    )
     st.plotly_chart(fig, use_container_width=True)
 
     st.subheader("Category Breakdown")
-    category_summary = transactions.groupby('Category')['Debit'].sum().reset_index()
-    fig = px.pie(category_summary, values='Debit', names='Category', title='Expenses by Category')
+    wait_for_write()
+    category_summary = summarize_categories(transactions, fingerprint, ledger_mtime())
+    fig = category_figure(
+        tuple(category_summary['Category'].astype(str)),
+        category_summary['Debit'].to_numpy(dtype=np.int64)
+    )
     st.plotly_chart(fig, use_container_width=True)
 
 if __name__ == "__main__":